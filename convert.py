@@ -1,11 +1,12 @@
 #!/usr/bin/env python3
 
 import base64
+import collections
 import countrycode
 import csv
-import dataclasses
 import datetime
-from functools import cache
+from functools import cache, lru_cache
+import itertools
 import json
 import logging
 import openpyxl
@@ -24,6 +25,15 @@ HBORDER_STYLE = openpyxl.styles.borders.Border(top=SIDE_BLACK_THIN, bottom=SIDE_
 BORDER_STYLE = openpyxl.styles.borders.Border(bottom=SIDE_BLACK_THIN, left=SIDE_BLACK_THIN, right=SIDE_BLACK_THIN)
 MBORDER_STYLE = openpyxl.styles.borders.Border(top=SIDE_BLACK_THIN, bottom=SIDE_BLACK_THIN, left=SIDE_BLACK_THIN, right=SIDE_BLACK_THIN)
 
+# named cell style: header row
+STYLE_HEADER = openpyxl.styles.NamedStyle(name='header', font=HFONT_STYLE, border=HBORDER_STYLE, number_format=openpyxl.styles.numbers.FORMAT_TEXT)
+
+# named cell styles: data rows
+STYLE_GENERAL = openpyxl.styles.NamedStyle(name='data-general', font=openpyxl.styles.fonts.DEFAULT_FONT, border=BORDER_STYLE, number_format=openpyxl.styles.numbers.FORMAT_GENERAL)
+STYLE_DATE = openpyxl.styles.NamedStyle(name='data-date', font=openpyxl.styles.fonts.DEFAULT_FONT, border=BORDER_STYLE, number_format=openpyxl.styles.numbers.FORMAT_DATE_YYYYMMDD2)
+STYLE_NUMBER = openpyxl.styles.NamedStyle(name='data-number', font=openpyxl.styles.fonts.DEFAULT_FONT, border=BORDER_STYLE, number_format=openpyxl.styles.numbers.FORMAT_NUMBER)
+STYLE_TEXT = openpyxl.styles.NamedStyle(name='data-text', font=openpyxl.styles.fonts.DEFAULT_FONT, border=BORDER_STYLE, number_format=openpyxl.styles.numbers.FORMAT_TEXT)
+
 # fill styles: certificate type
 FILL_CERT_TYPE_ROOT = openpyxl.styles.PatternFill(patternType='solid', fgColor='fcf3d0', bgColor='fcf3d0')
 FILL_CERT_TYPE_INTERMEDIATE = openpyxl.styles.PatternFill(patternType='solid', fgColor='dceaf6', bgColor='dceaf6')
@@ -37,6 +47,72 @@ FILL_TECHNICALLY_CONSTRAINED = openpyxl.styles.PatternFill(patternType='solid',
 # fill style: certificates not included in any root store
 FILL_NOT_TRUSTED = openpyxl.styles.PatternFill(patternType='solid', fgColor='c0c0c0', bgColor='c0c0c0')
 
+# conditional formatting rules: certificate type
+CERT_TYPE_RULES = (
+    openpyxl.formatting.rule.CellIsRule(
+        operator='equal',
+        formula=['"Root Certificate"'],
+        stopIfTrue=False,
+        fill=FILL_CERT_TYPE_ROOT
+        ),
+    openpyxl.formatting.rule.CellIsRule(
+        operator='equal',
+        formula=['"Intermediate Certificate"'],
+        stopIfTrue=False,
+        fill=FILL_CERT_TYPE_INTERMEDIATE
+        ),
+)
+
+# conditional formatting rules: revoked certificates
+CERT_REVOKED_RULES = (
+    openpyxl.formatting.rule.CellIsRule(
+        operator='equal',
+        formula=['"Revoked"'],
+        stopIfTrue=False,
+        fill=FILL_REVOKED
+        ),
+    openpyxl.formatting.rule.CellIsRule(
+        operator='equal',
+        formula=['"Parent Cert Revoked"'],
+        stopIfTrue=False,
+        fill=FILL_REVOKED
+        ),
+)
+
+# conditional formatting rules: technically-constrained certificates
+CERT_CONSTRAINED_RULES = (
+    openpyxl.formatting.rule.CellIsRule(
+        operator='equal',
+        formula=[True],
+        stopIfTrue=False,
+        fill=FILL_TECHNICALLY_CONSTRAINED
+        ),
+)
+
+# conditional formatting rules: certificates not included in any root store
+CERT_NOT_TRUSTED_RULES = (
+    openpyxl.formatting.rule.CellIsRule(
+        operator='equal',
+        formula=[False],
+        stopIfTrue=False,
+        fill=FILL_NOT_TRUSTED
+        ),
+)
+
+
+# column widths of AllCertificateRecords, starting from column A
+COLUMN_WIDTHS = (
+    14, 4, 36, 4, 24, 22, 24, 18, 18, 18,       # A-J
+    18, 4, 8, 8, 16, 4, 4, 12, 12, 4,           # K-T
+    4, 8, 36, 14, 14, 8, 24, 8, 14, 14,         # U-AD
+    12, 12, 12, 14, 14, 12, 12, 12, 14, 14,     # AE-AN
+    12, 12, 12, 14, 14, 12, 12, 12, 14, 14,     # AO-AX
+    12, 12, 12, 14, 14, 12, 12, 12, 14, 14,     # AY-BH
+    12, 12, 12, 14, 14, 8, 14, 12, 8, 14,       # BI-BR
+    12, 8, 14, 12, 14, 14, 14, 8, 8, 8,         # BS-CB
+    8, 12, 4, 4,                                # CC-CF
+)
+
 
 # logging stuff
 logging.basicConfig(
@@ -48,6 +124,18 @@ logging.Formatter.converter = time.gmtime
 Logger = logging.getLogger(__name__)
 
 
+def build_cldr_short_name_table():
+    table = dict()
+    for fromcode in (e for e in countrycode.codelist.keys() if e.startswith('cldr.short.')):
+        for candidate_name, iso2c in zip(countrycode.codelist[fromcode], countrycode.codelist['iso2c']):
+            table.setdefault(candidate_name.lower(), iso2c)
+    return table
+
+
+# lower-cased country names in any CLDR locale -> alpha-2 code
+CLDR_SHORT_NAME_TO_ISO2C = build_cldr_short_name_table()
+
+
 @cache
 def get_country_code(country_name):
     candidate = None
@@ -58,96 +146,103 @@ def get_country_code(country_name):
         if candidate:
             return candidate
         else:
-            for fromcode in (e for e in countrycode.codelist.keys() if e.startswith('cldr.short.')):
-                for pos, candidate_name in enumerate(countrycode.codelist[fromcode]):
-                    if candidate_name.lower() == country_name.lower():
-                        return countrycode.codelist['iso2c'][pos]
-    return ''
+            return CLDR_SHORT_NAME_TO_ISO2C.get(country_name.lower(), '')
+
+
+# boolean columns (in the CSV)
+BOOL_COLS = (
+    19,     # Technically Constrained
+    24,     # Audits Same as Parent?
+    62,     # CP Same as Parent?
+    65,     # CPS Same as Parent?
+    68,     # CP/CPS Same as Parent?
+    74,     # TLS Capable
+    75,     # TLS EV Capable
+    76,     # Code Signing Capable
+    77,     # S/MIME Capable
+)
+
+# date columns (in the CSV)
+DATE_COLS = (
+    15,     # Valid From (GMT)
+    16,     # Valid To (GMT)
+    27,     # Standard Audit Statement Date
+    28,     # Standard Audit Period Start Date
+    29,     # Standard Audit Period End Date
+    32,     # NetSec Audit Statement Date
+    33,     # NetSec Audit Period Start Date
+    34,     # NetSec Audit Period End Date
+    37,     # TLS BR Audit Statement Date
+    38,     # TLS BR Audit Period Start Date
+    39,     # TLS BR Audit Period End Date
+    42,     # TLS EVG Audit Statement Date
+    43,     # TLS EVG Audit Period Start Date
+    44,     # TLS EVG Audit Period End Date
+    47,     # Code Signing Audit Statement Date
+    48,     # Code Signing Audit Period Start Date
+    49,     # Code Signing Audit Period End Date
+    52,     # S/MIME BR Audit Statement Date
+    53,     # S/MIME BR Audit Period Start Date
+    54,     # S/MIME BR Audit Period End Date
+    57,     # VMC Audit Statement Date
+    58,     # VMC Audit Period Start Date
+    59,     # VMC Audit Period End Date
+    64,     # CP Last Update Date
+    67,     # CPS Last Update Date
+    70,     # CP/CPS Last Update Date
+)
+
+# general-format columns (in the sheet)
+SHEET_GENERAL_COLS = frozenset((12, 13, 21, 27, 65, 68, 71, 77, 78, 79, 80))
+
+# date columns (in the sheet)
+SHEET_DATE_COLS = (17, 18, 30, 31, 32, 35, 36, 37, 40, 41, 42, 45, 46, 47, 50, 51, 52, 55, 56, 57, 60, 61, 62, 67, 70, 73)
+
+# number columns (in the sheet)
+SHEET_NUMBER_COLS = frozenset((25,))
+
+# spellings of TRUE in boolean columns
+TRUE_VALUES = frozenset(('TRUE', 'True', 'true'))
+
+# root store statuses counted as "included" (Apple, Chrome, Microsoft, Mozilla)
+INCLUDED_STATUSES = frozenset(('Included', 'INCLUDED', 'included'))
+
+# YYYY.MM.DD -> YYYY-MM-DD
+DATE_SEPARATOR_TABLE = str.maketrans('.', '-')
+
+
+@lru_cache(maxsize=8192)
+def parse_date(date_str):
+    return datetime.date.fromisoformat(date_str)
+
+
+# Authority Key Identifiers repeat across the certificates of one issuer
+@lru_cache(maxsize=8192)
+def format_key_identifier(key_identifier_b64):
+    return base64.b64decode(key_identifier_b64).hex(':')
 
 
 def canonicalize(row):
-    # Technically Constrained
-    row[19] = (row[19].upper() == 'TRUE')
-    # Audits Same as Parent?
-    row[24] = (row[24].upper() == 'TRUE')
-    # CP Same as Parent?
-    row[62] = (row[62].upper() == 'TRUE')
-    # CPS Same as Parent?
-    row[65] = (row[65].upper() == 'TRUE')
-    # CP/CPS Same as Parent?
-    row[68] = (row[68].upper() == 'TRUE')
-    # TLS Capable
-    row[74] = (row[74].upper() == 'TRUE')
-    # TLS EV Capable
-    row[75] = (row[75].upper() == 'TRUE')
-    # Code Signing Capable
-    row[76] = (row[76].upper() == 'TRUE')
-    # S/MIME Capable
-    row[77] = (row[77].upper() == 'TRUE')
+    for col in BOOL_COLS:
+        row[col] = (row[col] in TRUE_VALUES)
 
     # Authority Key Identifier
     if row[17] != '':
-        row[17] = base64.b64decode(row[17]).hex(':')
-    # Subject Key Identifier
+        row[17] = format_key_identifier(row[17])
+    # Subject Key Identifier; unique per certificate, so kept out of the cache
     if row[18] != '':
         row[18] = base64.b64decode(row[18]).hex(':')
 
-    # Valid From (GMT)
-    row[15] = row[15].replace('.', '-')
-    # Valid To (GMT)
-    row[16] = row[16].replace('.', '-')
-    # Standard Audit Statement Date
-    row[27] = row[27].replace('.', '-')
-    # Standard Audit Period Start Date
-    row[28] = row[28].replace('.', '-')
-    # Standard Audit Period End Date
-    row[29] = row[29].replace('.', '-')
-    # NetSec Audit Statement Date
-    row[32] = row[32].replace('.', '-')
-    # NetSec Audit Period Start Date
-    row[33] = row[33].replace('.', '-')
-    # NetSec Audit Period End Date
-    row[34] = row[34].replace('.', '-')
-    # TLS BR Audit Statement Date
-    row[37] = row[37].replace('.', '-')
-    # TLS BR Audit Period Start Date
-    row[38] = row[38].replace('.', '-')
-    # TLS BR Audit Period End Date
-    row[39] = row[39].replace('.', '-')
-    # TLS EVG Audit Statement Date
-    row[42] = row[42].replace('.', '-')
-    # TLS EVG Audit Period Start Date
-    row[43] = row[43].replace('.', '-')
-    # TLS EVG Audit Period End Date
-    row[44] = row[44].replace('.', '-')
-    # Code Signing Audit Statement Date
-    row[47] = row[47].replace('.', '-')
-    # Code Signing Audit Period Start Date
-    row[48] = row[48].replace('.', '-')
-    # Code Signing Audit Period End Date
-    row[49] = row[49].replace('.', '-')
-    # S/MIME BR Audit Statement Date
-    row[52] = row[52].replace('.', '-')
-    # S/MIME BR Audit Period Start Date
-    row[53] = row[53].replace('.', '-')
-    # S/MIME BR Audit Period End Date
-    row[54] = row[54].replace('.', '-')
-    # VMC Audit Statement Date
-    row[57] = row[57].replace('.', '-')
-    # VMC Audit Period Start Date
-    row[58] = row[58].replace('.', '-')
-    # VMC Audit Period End Date
-    row[59] = row[59].replace('.', '-')
-    # CP Last Update Date
-    row[64] = row[64].replace('.', '-')
-    # CPS Last Update Date
-    row[67] = row[67].replace('.', '-')
-    # CP/CPS Last Update Date
-    row[70] = row[70].replace('.', '-')
-
-    # JSON array
+    for col in DATE_COLS:
+        row[col] = row[col].translate(DATE_SEPARATOR_TABLE)
+
+    # JSON array; the number of its items is returned
     if row[22] != '':
-        row[22] = '\n'.join(json.loads(row[22]))
+        partitioned_crls = json.loads(row[22])
+        row[22] = '\n'.join(partitioned_crls)
+        return len(partitioned_crls)
+    else:
+        return ''
 
 
 def add_metadata_sheet(metadata_sheet):
@@ -185,277 +280,171 @@ def add_metadata_sheet(metadata_sheet):
     metadata_sheet.append(row)
 
 
-@dataclasses.dataclass(eq=False)
-class CACertificate:
-    is_root: bool
-    is_trusted: bool | None
-    children: set = dataclasses.field(default_factory=set)
-
-
 def main():
-    cert_by_sfid = dict()
+    # CA certificates are kept as parallel arrays indexed by an integer handle
+    cert_idx_by_sfid = dict()
+    cert_is_root = bytearray()
+    cert_is_trusted = list()
     cert_forest_edges = list()
     cert_forest_roots = set()
 
-    Logger.info('START pass 1 of loading the table')
-    num_records = 0
-    with open('AllCertificateRecordsCSVFormatv2', 'r', encoding='UTF-8', newline='') as csv_fh:
-        csv_reader = csv.reader(csv_fh, dialect='unix')
-        for row in csv_reader:
-            num_records += 1
+    Logger.info('START loading the table')
+    rows = list()
+    rows_is_included = list()
+    with open('AllCertificateRecordsCSVFormatv2', 'r', encoding='UTF-8', newline='', buffering=1 << 20) as csv_fh:
+        csv_reader = csv.reader(csv_fh, dialect='unix', strict=True)
+        for row_no, row in enumerate(csv_reader, 1):
+            if len(row) != 79:
+                raise RuntimeError(f"unexpected number of rows {len(row)} at CSV line {row_no}")
+            is_included = not INCLUDED_STATUSES.isdisjoint(row[7:11])
+            rows.append(row)
+            rows_is_included.append(is_included)
 
             sfid = row[1]
             paernt_sfid = row[3]
             is_root = row[5] == 'Root Certificate'
             if is_root:
-                is_trusted = any(e.capitalize() == 'Included' for e in row[7:11])
+                is_trusted = is_included
             else:
                 is_trusted = None
-            cert_by_sfid[sfid] = CACertificate(is_root=is_root, is_trusted=is_trusted)
-            cert_forest_edges.append((paernt_sfid, sfid))
-    Logger.info('END pass 1 of loading the table')
+            cert_idx = cert_idx_by_sfid.setdefault(sfid, len(cert_is_root))
+            if cert_idx == len(cert_is_root):
+                cert_is_root.append(is_root)
+                cert_is_trusted.append(is_trusted)
+            else:
+                cert_is_root[cert_idx] = is_root
+                cert_is_trusted[cert_idx] = is_trusted
+            cert_forest_edges.append((paernt_sfid, cert_idx))
+    Logger.info('END loading the table')
 
     Logger.info('START building CA tree')
-    for parent_sfid, child_sfid in cert_forest_edges:
-        if parent_sfid in cert_by_sfid:
-            cert_by_sfid[parent_sfid].children.add(child_sfid)
+    cert_children = [list() for _ in range(len(cert_is_root))]
+    for parent_sfid, child_idx in cert_forest_edges:
+        parent_idx = cert_idx_by_sfid.get(parent_sfid)
+        if parent_idx is not None:
+            cert_children[parent_idx].append(child_idx)
         else:
-            cert_forest_roots.add(child_sfid)
+            cert_forest_roots.add(child_idx)
     del cert_forest_edges
-    hier_stack = [list(cert_forest_roots)]
-    while hier_stack:
-        if len(hier_stack) > 7:
+    # breadth-first walk; depth of the forest roots is 1
+    cert_queue = collections.deque((cert_idx, 1) for cert_idx in cert_forest_roots)
+    while cert_queue:
+        cert_idx, depth = cert_queue.popleft()
+        children = cert_children[cert_idx]
+        if children and depth >= 7:
             raise RuntimeError('loop detected while CA tree walk')
-        if hier_stack[-1]:
-            sfid = hier_stack[-1][-1]
-            next_children = list(cert_by_sfid[sfid].children)
-            for child_sfid in next_children:
-                if not cert_by_sfid[child_sfid].is_root:
-                    cert_by_sfid[child_sfid].is_trusted = cert_by_sfid[sfid].is_trusted
-            hier_stack[-1].pop()
-            if next_children:
-                hier_stack.append(next_children)
-        else:
-            hier_stack.pop()
+        for child_idx in children:
+            if not cert_is_root[child_idx]:
+                cert_is_trusted[child_idx] = cert_is_trusted[cert_idx]
+            cert_queue.append((child_idx, depth + 1))
     del cert_forest_roots
+    del cert_children
     Logger.info('END building CA tree')
 
     Logger.info('START preparing workbook')
     book = openpyxl.Workbook(write_only=True)
+    for style in (STYLE_HEADER, STYLE_GENERAL, STYLE_DATE, STYLE_NUMBER, STYLE_TEXT):
+        book.add_named_style(style)
 
     sheet = book.create_sheet(title='AllCertificateRecords')
 
-    sheet.auto_filter.ref = f"A1:CF{num_records}"
+    sheet.sheet_format.defaultRowHeight = 13.5
+    sheet.sheet_format.customHeight = True
     sheet.freeze_panes = 'D2'
-    sheet.column_dimensions['A'].width = 14
-    sheet.column_dimensions['B'].width = 4
-    sheet.column_dimensions['C'].width = 36
-    sheet.column_dimensions['D'].width = 4
-    sheet.column_dimensions['E'].width = 24
-    sheet.column_dimensions['F'].width = 22
-    sheet.column_dimensions['G'].width = 24
-    sheet.column_dimensions['H'].width = 18
-    sheet.column_dimensions['I'].width = 18
-    sheet.column_dimensions['J'].width = 18
-    sheet.column_dimensions['K'].width = 18
-    sheet.column_dimensions['L'].width = 4
-    sheet.column_dimensions['M'].width = 8
-    sheet.column_dimensions['N'].width = 8
-    sheet.column_dimensions['O'].width = 16
-    sheet.column_dimensions['P'].width = 4
-    sheet.column_dimensions['Q'].width = 4
-    sheet.column_dimensions['R'].width = 12
-    sheet.column_dimensions['S'].width = 12
-    sheet.column_dimensions['T'].width = 4
-    sheet.column_dimensions['U'].width = 4
-    sheet.column_dimensions['V'].width = 8
-    sheet.column_dimensions['W'].width = 36
-    sheet.column_dimensions['X'].width = 14
-    sheet.column_dimensions['Y'].width = 14
-    sheet.column_dimensions['Z'].width = 8
-    sheet.column_dimensions['AA'].width = 24
-    sheet.column_dimensions['AB'].width = 8
-    sheet.column_dimensions['AC'].width = 14
-    sheet.column_dimensions['AD'].width = 14
-    sheet.column_dimensions['AE'].width = 12
-    sheet.column_dimensions['AF'].width = 12
-    sheet.column_dimensions['AG'].width = 12
-    sheet.column_dimensions['AH'].width = 14
-    sheet.column_dimensions['AI'].width = 14
-    sheet.column_dimensions['AJ'].width = 12
-    sheet.column_dimensions['AK'].width = 12
-    sheet.column_dimensions['AL'].width = 12
-    sheet.column_dimensions['AM'].width = 14
-    sheet.column_dimensions['AN'].width = 14
-    sheet.column_dimensions['AO'].width = 12
-    sheet.column_dimensions['AP'].width = 12
-    sheet.column_dimensions['AQ'].width = 12
-    sheet.column_dimensions['AR'].width = 14
-    sheet.column_dimensions['AS'].width = 14
-    sheet.column_dimensions['AT'].width = 12
-    sheet.column_dimensions['AU'].width = 12
-    sheet.column_dimensions['AV'].width = 12
-    sheet.column_dimensions['AW'].width = 14
-    sheet.column_dimensions['AX'].width = 14
-    sheet.column_dimensions['AY'].width = 12
-    sheet.column_dimensions['AZ'].width = 12
-    sheet.column_dimensions['BA'].width = 12
-    sheet.column_dimensions['BB'].width = 14
-    sheet.column_dimensions['BC'].width = 14
-    sheet.column_dimensions['BD'].width = 12
-    sheet.column_dimensions['BE'].width = 12
-    sheet.column_dimensions['BF'].width = 12
-    sheet.column_dimensions['BG'].width = 14
-    sheet.column_dimensions['BH'].width = 14
-    sheet.column_dimensions['BI'].width = 12
-    sheet.column_dimensions['BJ'].width = 12
-    sheet.column_dimensions['BK'].width = 12
-    sheet.column_dimensions['BL'].width = 14
-    sheet.column_dimensions['BM'].width = 14
-    sheet.column_dimensions['BN'].width = 8
-    sheet.column_dimensions['BO'].width = 14
-    sheet.column_dimensions['BP'].width = 12
-    sheet.column_dimensions['BQ'].width = 8
-    sheet.column_dimensions['BR'].width = 14
-    sheet.column_dimensions['BS'].width = 12
-    sheet.column_dimensions['BT'].width = 8
-    sheet.column_dimensions['BU'].width = 14
-    sheet.column_dimensions['BV'].width = 12
-    sheet.column_dimensions['BW'].width = 14
-    sheet.column_dimensions['BX'].width = 14
-    sheet.column_dimensions['BY'].width = 14
-    sheet.column_dimensions['BZ'].width = 8
-    sheet.column_dimensions['CA'].width = 8
-    sheet.column_dimensions['CB'].width = 8
-    sheet.column_dimensions['CC'].width = 8
-    sheet.column_dimensions['CD'].width = 12
-    sheet.column_dimensions['CE'].width = 4
-    sheet.column_dimensions['CF'].width = 4
-
-    cert_type_rules = [
-        openpyxl.formatting.rule.CellIsRule(
-            operator='equal',
-            formula=['"Root Certificate"'],
-            stopIfTrue=False,
-            fill=FILL_CERT_TYPE_ROOT
-            ),
-        openpyxl.formatting.rule.CellIsRule(
-            operator='equal',
-            formula=['"Intermediate Certificate"'],
-            stopIfTrue=False,
-            fill=FILL_CERT_TYPE_INTERMEDIATE
-            ),
-    ]
-    for rule in cert_type_rules:
-        sheet.conditional_formatting.add(f"F2:F{num_records}", rule)
-
-    cert_revoked_rules = [
-        openpyxl.formatting.rule.CellIsRule(
-            operator='equal',
-            formula=['"Revoked"'],
-            stopIfTrue=False,
-            fill=FILL_REVOKED
-            ),
-        openpyxl.formatting.rule.CellIsRule(
-            operator='equal',
-            formula=['"Parent Cert Revoked"'],
-            stopIfTrue=False,
-            fill=FILL_REVOKED
-            ),
-    ]
-    for rule in cert_revoked_rules:
-        sheet.conditional_formatting.add(f"O2:O{num_records}", rule)
-
-    cert_constrained_rules = [
-        openpyxl.formatting.rule.CellIsRule(
-            operator='equal',
-            formula=[True],
-            stopIfTrue=False,
-            fill=FILL_TECHNICALLY_CONSTRAINED
-            ),
-    ]
-    for rule in cert_constrained_rules:
-        sheet.conditional_formatting.add(f"V2:V{num_records}", rule)
-
-    cert_not_trusted_rules = [
-        openpyxl.formatting.rule.CellIsRule(
-            operator='equal',
-            formula=[False],
-            stopIfTrue=False,
-            fill=FILL_NOT_TRUSTED
-            ),
-    ]
-    for rule in cert_not_trusted_rules:
-        sheet.conditional_formatting.add(f"M2:M{num_records}", rule)
-        sheet.conditional_formatting.add(f"N2:N{num_records}", rule)
+    col_idx = 1
+    for width, same_width_cols in itertools.groupby(COLUMN_WIDTHS):
+        num_cols = len(list(same_width_cols))
+        # a run of equally wide columns is written as one <col min= max=> element
+        col_dim = sheet.column_dimensions[openpyxl.utils.get_column_letter(col_idx)]
+        col_dim.min = col_idx
+        col_dim.max = col_idx + num_cols - 1
+        col_dim.width = width
+        col_idx += num_cols
     Logger.info('END preparing workbook')
 
-    Logger.info('START pass 2 of loading the table')
-    with open('AllCertificateRecordsCSVFormatv2', 'r', encoding='UTF-8', newline='') as csv_fh:
-        csv_reader = csv.reader(csv_fh, dialect='unix')
-        header = next(csv_reader)
-        header.append('X-Country (alpha-2)')
-        header.append('X-crt.sh link')
-        header.insert(23, 'X-Number of items in "JSON Array of Partitioned CRLs"')
-        header.insert(12, 'X-Chains up to Roots Included in any Root Store?')
-        header.insert(12, 'X-Included in any Root Store?')
-        header = [openpyxl.cell.WriteOnlyCell(sheet, value=hc) for hc in header]
-        for hc in header:
-            hc.font = HFONT_STYLE
-            hc.border = HBORDER_STYLE
-            hc.number_format = openpyxl.styles.numbers.FORMAT_TEXT
-        sheet.row_dimensions[1].height = 14.25
-        sheet.append(header)
-
-        for row_no, row in enumerate(csv_reader, 2):
-            if len(row) != 79:
-                raise RuntimeError(f"unexpected number of rows {len(row)} at CSV line {row_no}")
-            canonicalize(row)
+    Logger.info('START writing the table')
+    header = rows[0]
+    header.append('X-Country (alpha-2)')
+    header.append('X-crt.sh link')
+    header.insert(23, 'X-Number of items in "JSON Array of Partitioned CRLs"')
+    header.insert(12, 'X-Chains up to Roots Included in any Root Store?')
+    header.insert(12, 'X-Included in any Root Store?')
+    header = [openpyxl.cell.WriteOnlyCell(sheet, value=hc) for hc in header]
+    for hc in header:
+        hc.style = STYLE_HEADER.name
+    sheet.row_dimensions[1].height = 14.25
+    sheet.append(header)
+    num_records = 1
+
+    data_style_names = list()
+    for col_idx in range(len(header)):
+        if col_idx in SHEET_GENERAL_COLS:
+            data_style_names.append(STYLE_GENERAL.name)
+        elif col_idx in SHEET_DATE_COLS:
+            data_style_names.append(STYLE_DATE.name)
+        elif col_idx in SHEET_NUMBER_COLS:
+            data_style_names.append(STYLE_NUMBER.name)
+        else:
+            data_style_names.append(STYLE_TEXT.name)
 
-            # X-Country (alpha-2)
-            row.append(get_country_code(row[78]))
+    write_only_cell = openpyxl.cell.WriteOnlyCell
 
-            # X-crt.sh link
-            row.append(f"https://crt.sh/?sha256={row[13]}")
+    def make_data_cell(value, style_name):
+        cell = write_only_cell(sheet, value=value)
+        cell.style = style_name
+        return cell
 
-            # X-Number of items in "JSON Array of Partitioned CRLs"
-            if row[22] != '':
-                row.insert(23, row[22].count('\n') + 1)
-            else:
-                row.insert(23, '')
+    sheet_append = sheet.append
+    for row_no, (row, is_included) in enumerate(zip(rows[1:], rows_is_included[1:]), 2):
+        # X-Number of items in "JSON Array of Partitioned CRLs"
+        num_partitioned_crls = canonicalize(row)
 
-            # X-Chains up to Roots Included in any Root Store?
-            if row[5] == 'Intermediate Certificate':
-                row.insert(12, cert_by_sfid[row[1]].is_trusted)
+        # X-Chains up to Roots Included in any Root Store?
+        if row[5] == 'Intermediate Certificate':
+            chains_up_to_included = cert_is_trusted[cert_idx_by_sfid[row[1]]]
+        else:
+            chains_up_to_included = None
+
+        # X-Country (alpha-2)
+        country_code = get_country_code(row[78])
+
+        # X-crt.sh link
+        crtsh_link = f'=HYPERLINK("https://crt.sh/?sha256={row[13]}","\U0001F4DC")'
+
+        # same column order as the header
+        row = [
+            *row[:12],
+            is_included,
+            chains_up_to_included,
+            *row[12:23],
+            num_partitioned_crls,
+            *row[23:],
+            country_code,
+            crtsh_link,
+        ]
+
+        for col_idx in SHEET_DATE_COLS:
+            if row[col_idx] != '':
+                row[col_idx] = parse_date(row[col_idx])
             else:
-                row.insert(12, None)
-
-            # X-Included in any Root Store?
-            row.insert(12, any(e.capitalize() == 'Included' for e in row[7:11]))
-
-            row = [openpyxl.cell.WriteOnlyCell(sheet, value=c) for c in row]
-            for col_idx, cell in enumerate(row):
-                cell.border = BORDER_STYLE
-                if col_idx in {12, 13, 21, 27, 65, 68, 71, 77, 78, 79, 80}:
-                    cell.number_format = openpyxl.styles.numbers.FORMAT_GENERAL
-                elif col_idx in {17, 18, 30, 31, 32, 35, 36, 37, 40, 41, 42, 45, 46, 47, 50, 51, 52, 55, 56, 57, 60, 61, 62, 67, 70, 73}:
-                    cell.number_format = openpyxl.styles.numbers.FORMAT_DATE_YYYYMMDD2
-                    if cell.value != '':
-                        cell.value = datetime.date.fromisoformat(cell.value)
-                    else:
-                        cell.value = None
-                elif col_idx in {25}:
-                    cell.number_format = openpyxl.styles.numbers.FORMAT_NUMBER
-                elif col_idx in {83}:
-                    cell.number_format = openpyxl.styles.numbers.FORMAT_TEXT
-                    href = cell.value
-                    cell.value = '\U0001F4DC'
-                    cell.hyperlink = href
-                else:
-                    cell.number_format = openpyxl.styles.numbers.FORMAT_TEXT
-            sheet.row_dimensions[row_no].height = 13.5
-            sheet.append(row)
-    Logger.info('END pass 2 of loading the table')
+                row[col_idx] = None
+
+        row = [make_data_cell(c, style_name) for c, style_name in zip(row, data_style_names)]
+        sheet_append(row)
+        num_records += 1
+
+    # the auto filter and conditional formats are written after <sheetData>,
+    # so they can be set once the number of rows is known
+    sheet.auto_filter.ref = f"A1:CF{num_records}"
+    for rule in CERT_TYPE_RULES:
+        sheet.conditional_formatting.add(f"F2:F{num_records}", rule)
+    for rule in CERT_REVOKED_RULES:
+        sheet.conditional_formatting.add(f"O2:O{num_records}", rule)
+    for rule in CERT_CONSTRAINED_RULES:
+        sheet.conditional_formatting.add(f"V2:V{num_records}", rule)
+    for rule in CERT_NOT_TRUSTED_RULES:
+        sheet.conditional_formatting.add(f"M2:N{num_records}", rule)
+    Logger.info('END writing the table')
 
     add_metadata_sheet(book.create_sheet(title='_metadata'))
 